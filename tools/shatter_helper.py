@@ -1,14 +1,31 @@
 import os
 import math
-import random
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
 import tkinter as tk
 from tkinter import filedialog
 
+import numpy as np
 from PIL import Image
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+try:
+    import imageio.v3 as iio
+except ImportError:
+    iio = None
+
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+
 
 # ------------------------------------------------------------
 # Config defaults
@@ -23,28 +40,14 @@ PARTICLE_GRAVITY = 0.15
 
 
 @dataclass
-class Pixel:
-    x: int
-    y: int
-    color: Tuple[int, int, int, int]
-    shard_id: int
-
-
-@dataclass
-class ShardMotion:
-    vx: float
-    vy: float
-    t_hit: int
-
-
-@dataclass
-class Particle:
-    x: float
-    y: float
-    vx: float
-    vy: float
-    life: int
-    max_life: int
+class ParticleState:
+    """Struct-of-arrays particle pool; one slot per particle."""
+    x: np.ndarray
+    y: np.ndarray
+    vx: np.ndarray
+    vy: np.ndarray
+    life: np.ndarray
+    max_life: np.ndarray
 
 
 # ------------------------------------------------------------
@@ -54,37 +57,40 @@ class Particle:
 def extract_pixels_and_shards(
     img: Image.Image,
     approx_shards: int,
-) -> Tuple[List[Pixel], Dict[int, Tuple[float, float]], Dict[int, int]]:
+) -> Tuple[
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    Dict[int, Tuple[float, float]],
+    Dict[int, int],
+]:
     """
     Extract non transparent pixels, assign them to shards using a grid whose
     cell size is derived from approx_shards, and compute shard centers and
     bottom y for each shard.
+
+    Pixels are returned struct-of-arrays as (px_x, px_y, px_rgba, px_sid) so
+    the render loop can do whole-array math instead of walking Python
+    objects: px_x/px_y/px_sid are int32 arrays and px_rgba is (N, 4) uint8.
     """
-    img = img.convert("RGBA")
-    w, h = img.size
-    pixels_raw = img.load()
-
-    # First pass: find bounding box of solid pixels
-    min_x, min_y = w, h
-    max_x, max_y = -1, -1
-
-    for y in range(h):
-        for x in range(w):
-            r, g, b, a = pixels_raw[x, y]
-            if a <= ALPHA_THRESHOLD:
-                continue
-            if x < min_x:
-                min_x = x
-            if y < min_y:
-                min_y = y
-            if x > max_x:
-                max_x = x
-            if y > max_y:
-                max_y = y
-
-    if max_x < min_x or max_y < min_y:
+    arr = np.asarray(img.convert("RGBA"))
+    mask = arr[..., 3] > ALPHA_THRESHOLD
+    # np.nonzero scans row-major, matching the old y-outer/x-inner loops, so
+    # shard ids are first seen (and dicts populated) in the same order.
+    ys, xs = np.nonzero(mask)
+
+    if ys.size == 0:
         # no solid pixels
-        return [], {}, {}
+        empty = (
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int32),
+            np.empty((0, 4), dtype=np.uint8),
+            np.empty(0, dtype=np.int32),
+        )
+        return empty, {}, {}
+
+    min_x = int(xs.min())
+    max_x = int(xs.max())
+    min_y = int(ys.min())
+    max_y = int(ys.max())
 
     eff_w = max_x - min_x + 1
     eff_h = max_y - min_y + 1
@@ -97,50 +103,74 @@ def extract_pixels_and_shards(
     num_cells_x = max(1, math.ceil(eff_w / cell_size))
     num_cells_y = max(1, math.ceil(eff_h / cell_size))
 
-    pixels: List[Pixel] = []
-    shard_accum: Dict[int, Tuple[float, float, int]] = {}
-    shard_bottoms: Dict[int, int] = {}
-
-    # Second pass: assign shards and collect stats
-    for y in range(h):
-        for x in range(w):
-            r, g, b, a = pixels_raw[x, y]
-            if a <= ALPHA_THRESHOLD:
-                continue
-
-            cell_x = (x - min_x) // cell_size
-            cell_y = (y - min_y) // cell_size
-            if cell_x < 0:
-                cell_x = 0
-            if cell_y < 0:
-                cell_y = 0
-            if cell_x >= num_cells_x:
-                cell_x = num_cells_x - 1
-            if cell_y >= num_cells_y:
-                cell_y = num_cells_y - 1
-
-            shard_id = cell_y * num_cells_x + cell_x
-
-            pixels.append(Pixel(x=x, y=y, color=(r, g, b, a), shard_id=shard_id))
-
-            sx, sy, c = shard_accum.get(shard_id, (0.0, 0.0, 0))
-            shard_accum[shard_id] = (sx + x, sy + y, c + 1)
-
-            bottom = shard_bottoms.get(shard_id, y)
-            if y > bottom:
-                shard_bottoms[shard_id] = y
-            else:
-                shard_bottoms.setdefault(shard_id, y)
-
-    # compute shard centers
-    shard_centers: Dict[int, Tuple[float, float]] = {}
-    for sid, (sx, sy, c) in shard_accum.items():
-        if c > 0:
-            shard_centers[sid] = (sx / c, sy / c)
+    cell_x = np.clip((xs - min_x) // cell_size, 0, num_cells_x - 1)
+    cell_y = np.clip((ys - min_y) // cell_size, 0, num_cells_y - 1)
+    shard_ids = cell_y * num_cells_x + cell_x
+    colors = arr[ys, xs]
+
+    # Shard stats in three C-level passes instead of a Python dict update
+    # per pixel: bincount for counts and coordinate sums, maximum.at for
+    # the bottom row of each shard.
+    counts = np.bincount(shard_ids)
+    sum_x = np.bincount(shard_ids, weights=xs.astype(np.float64))
+    sum_y = np.bincount(shard_ids, weights=ys.astype(np.float64))
+    bottoms = np.zeros(counts.size, dtype=np.int64)
+    np.maximum.at(bottoms, shard_ids, ys)
+
+    occupied = np.nonzero(counts)[0]
+    centers_x = sum_x[occupied] / counts[occupied]
+    centers_y = sum_y[occupied] / counts[occupied]
+
+    shard_centers: Dict[int, Tuple[float, float]] = {
+        int(sid): (float(cx), float(cy))
+        for sid, cx, cy in zip(occupied, centers_x, centers_y)
+    }
+    shard_bottoms: Dict[int, int] = {
+        int(sid): int(bottoms[sid]) for sid in occupied
+    }
 
+    # Sort pixels by shard id (stable, so within a shard the row-major paint
+    # order survives): pixels sharing a motion become contiguous runs, which
+    # lets the renderer expand per-shard displacements with np.repeat and
+    # keeps shard-coherent memory access in the render kernel.
+    order = np.argsort(shard_ids, kind="stable")
+    pixels = (
+        xs[order].astype(np.int32),
+        ys[order].astype(np.int32),
+        colors[order],
+        shard_ids[order].astype(np.int32),
+    )
     return pixels, shard_centers, shard_bottoms
 
 
+def precompute_radial(
+    shard_centers: Dict[int, Tuple[float, float]],
+    img_w: int,
+    img_h: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Unit vectors from the sprite center to each shard center.
+
+    Depends only on shard geometry, not on the break direction, so main()
+    computes it once per image and reuses it for every animation.
+    Returns (sids, rx, ry) aligned arrays.
+    """
+    cx = img_w / 2.0
+    cy = img_h / 2.0
+
+    n = len(shard_centers)
+    sids = np.fromiter(shard_centers.keys(), dtype=np.int64, count=n)
+    sx = np.fromiter((c[0] for c in shard_centers.values()), dtype=np.float32, count=n)
+    sy = np.fromiter((c[1] for c in shard_centers.values()), dtype=np.float32, count=n)
+
+    rx = sx - cx
+    ry = sy - cy
+    rlen = np.hypot(rx, ry)
+    rlen[rlen == 0.0] = 1.0
+    rx /= rlen
+    ry /= rlen
+    return sids, rx, ry
+
+
 def build_shard_motions(
     shard_centers: Dict[int, Tuple[float, float]],
     shard_bottoms: Dict[int, int],
@@ -150,71 +180,92 @@ def build_shard_motions(
     origin_y: int,
     frame_count: int,
     direction: str,
-) -> Dict[int, ShardMotion]:
+    radial: Tuple[np.ndarray, np.ndarray, np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Create motion parameters for each shard: horizontal velocity, vertical
     velocity and the frame at which the shard hits the ground.
     All shards will be at or on the ground by the last frame.
+
+    Returns dense (mv_x, mv_y, mv_th) arrays indexed by shard id; ids with
+    no shard keep t_hit 0, which render_animation treats as "no motion".
+
+    `radial` is the (sids, rx, ry) triple from precompute_radial; pass it
+    in when rendering several directions so it is only built once.
     """
-    cx = img_w / 2.0
-    cy = img_h / 2.0
     ground_y = origin_y + img_h - 1
 
-    motions: Dict[int, ShardMotion] = {}
-
     if frame_count <= 1:
         min_hit = max_hit = 1
     else:
         min_hit = max(1, int(frame_count * 0.6))
         max_hit = frame_count - 1 if frame_count > 1 else 1
 
-    for sid, (sx, sy) in shard_centers.items():
-        # radial direction (from sprite center)
-        rx = sx - cx
-        ry = sy - cy
-        rlen = math.hypot(rx, ry) or 1.0
-        rx /= rlen
-        ry /= rlen
-
-        # base directional bias
-        if direction == "left":
-            base_x, base_y = -1.0, 0.1
-        elif direction == "forward":
-            base_x, base_y = 0.0, 1.0
-        elif direction == "backward":
-            base_x, base_y = 0.6, -0.3
-        else:
-            base_x, base_y = 0.0, 1.0
-
-        mix = 0.6
-        dir_x = base_x * mix + rx * (1.0 - mix)
-        dir_y = base_y * mix + ry * (1.0 - mix)
-
-        dir_x += random.uniform(-0.2, 0.2)
-        dir_y += random.uniform(-0.2, 0.2)
-
-        dlen = math.hypot(dir_x, dir_y) or 1.0
-        dir_x /= dlen
-        dir_y /= dlen
+    # float32 throughout: positions round to integer pixels anyway, and the
+    # narrower lanes halve the bandwidth of the per-pixel gathers.
+    num_shards = max(shard_centers) + 1 if shard_centers else 0
+    mv_x = np.zeros(num_shards, dtype=np.float32)
+    mv_y = np.zeros(num_shards, dtype=np.float32)
+    mv_th = np.zeros(num_shards, dtype=np.float32)
+    if not shard_centers:
+        return mv_x, mv_y, mv_th
+
+    if radial is None:
+        radial = precompute_radial(shard_centers, img_w, img_h)
+    sids, rx, ry = radial
+    n = sids.size
+
+    # base directional bias
+    if direction == "left":
+        base_x, base_y = -1.0, 0.1
+    elif direction == "forward":
+        base_x, base_y = 0.0, 1.0
+    elif direction == "backward":
+        base_x, base_y = 0.6, -0.3
+    else:
+        base_x, base_y = 0.0, 1.0
 
-        speed = random.uniform(MAX_SPEED * 0.4, MAX_SPEED)
-        vx = dir_x * speed
+    rng = np.random.default_rng()
+    mix = 0.6
+    dir_x = base_x * mix + rx * (1.0 - mix) + rng.uniform(-0.2, 0.2, n)
+    dir_y = base_y * mix + ry * (1.0 - mix) + rng.uniform(-0.2, 0.2, n)
 
-        # choose when this shard hits the ground
-        t_hit = random.randint(min_hit, max_hit) if max_hit >= min_hit else max_hit
+    dlen = np.hypot(dir_x, dir_y)
+    dlen[dlen == 0.0] = 1.0
+    speed = rng.uniform(MAX_SPEED * 0.4, MAX_SPEED, n)
+    vx = dir_x / dlen * speed
 
-        # bottom pixel of this shard in image space
-        bottom_y_local = shard_bottoms.get(sid, int(round(sy)))
-        y0_bottom_world = origin_y + bottom_y_local
+    # choose when each shard hits the ground
+    if max_hit >= min_hit:
+        t_hit = rng.integers(min_hit, max_hit + 1, n).astype(np.float64)
+    else:
+        t_hit = np.full(n, float(max_hit))
 
-        # solve for vy such that bottom pixel is at the ground at t_hit:
-        # y0 + vy * t + 0.5 * g * t^2 = ground_y
-        # => vy = (ground_y - y0 - 0.5 * g * t^2) / t
-        vy = (ground_y - y0_bottom_world - 0.5 * GRAVITY * (t_hit ** 2)) / float(t_hit)
+    # bottom pixel of each shard in image space (fall back to the center row)
+    bottoms = np.fromiter(
+        (shard_bottoms.get(int(sid), np.nan) for sid in sids),
+        dtype=np.float32,
+        count=n,
+    )
+    missing = np.isnan(bottoms)
+    if missing.any():
+        center_rows = np.fromiter(
+            (shard_centers[int(sid)][1] for sid in sids),
+            dtype=np.float32,
+            count=n,
+        )
+        bottoms[missing] = np.rint(center_rows[missing])
+    y0_bottom_world = origin_y + bottoms
 
-        motions[sid] = ShardMotion(vx=vx, vy=vy, t_hit=t_hit)
+    # solve for vy such that the bottom pixel is at the ground at t_hit:
+    # y0 + vy * t + 0.5 * g * t^2 = ground_y
+    # => vy = (ground_y - y0 - 0.5 * g * t^2) / t
+    vy = (ground_y - y0_bottom_world - 0.5 * GRAVITY * t_hit ** 2) / t_hit
 
-    return motions
+    mv_x[sids] = vx
+    mv_y[sids] = vy
+    mv_th[sids] = t_hit
+    return mv_x, mv_y, mv_th
 
 
 # ------------------------------------------------------------
@@ -228,79 +279,270 @@ def create_particles(
     img_h: int,
     frame_count: int,
     direction: str,
-) -> List[Particle]:
-    particles: List[Particle] = []
-
+) -> ParticleState:
     cx = origin_x + img_w / 2.0
     cy = origin_y + img_h / 2.0
 
-    for _ in range(PARTICLE_COUNT):
-        px = cx + random.uniform(-img_w * 0.4, img_w * 0.4)
-        py = cy + random.uniform(-img_h * 0.2, img_h * 0.2)
+    rng = np.random.default_rng()
+    n = PARTICLE_COUNT
 
-        if direction == "left":
-            base_vx = random.uniform(-2.0, -0.2)
-        elif direction == "forward":
-            base_vx = random.uniform(-0.5, 0.5)
-        else:
-            base_vx = random.uniform(0.2, 2.0)
+    x = cx + rng.uniform(-img_w * 0.4, img_w * 0.4, n)
+    y = cy + rng.uniform(-img_h * 0.2, img_h * 0.2, n)
+
+    if direction == "left":
+        vx_lo, vx_hi = -2.0, -0.2
+    elif direction == "forward":
+        vx_lo, vx_hi = -0.5, 0.5
+    else:
+        vx_lo, vx_hi = 0.2, 2.0
+    vx = rng.uniform(vx_lo, vx_hi, n)
+    vy = rng.uniform(-1.5, 0.5, n)
+
+    life = rng.integers(int(frame_count * 0.4), frame_count + 1, n).astype(np.int32)
+    return ParticleState(
+        x=x.astype(np.float32),
+        y=y.astype(np.float32),
+        vx=vx.astype(np.float32),
+        vy=vy.astype(np.float32),
+        life=life,
+        max_life=life.copy(),
+    )
 
-        base_vy = random.uniform(-1.5, 0.5)
 
-        life = random.randint(int(frame_count * 0.4), frame_count)
+def draw_particles(canvas: np.ndarray, particles: ParticleState, steps: int):
+    """Composite the particle pool after `steps` integrations, closed form.
 
-        particles.append(
-            Particle(
-                x=px,
-                y=py,
-                vx=base_vx,
-                vy=base_vy,
-                life=life,
-                max_life=life,
-            )
-        )
+    The old per-frame update was x += vx; y += vy; vy += g; life -= 1,
+    which telescopes to x0 + k*vx and y0 + k*vy0 + g*k*(k-1)/2 after k
+    steps. Evaluating that directly makes every frame independent of the
+    previous one, which is what lets frames render in parallel.
+    """
+    h, w = canvas.shape[:2]
 
-    return particles
+    life_now = particles.life - steps
+    px = particles.x + steps * particles.vx
+    py = particles.y + steps * particles.vy + PARTICLE_GRAVITY * steps * (steps - 1) / 2.0
 
+    ix = np.rint(px).astype(np.int32)
+    iy = np.rint(py).astype(np.int32)
+    live = (life_now > 0) & (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+    if not live.any():
+        return
+    ix = ix[live]
+    iy = iy[live]
+
+    # Over-composite white particles in one batch of integer array ops
+    # instead of a Python loop per particle. Particles landing on the same
+    # pixel resolve to the last write rather than stacking, which is
+    # invisible at this particle density.
+    alpha = (255 * life_now[live] // particles.max_life[live]).astype(np.int32)
+    inv = 255 - alpha
+    dst = canvas[iy, ix].astype(np.int32)
+    da = dst[:, 3]
+    out_a = alpha + da * inv // 255
+    # The un-premultiply can overshoot 255 by one due to the floored
+    # denominator; PIL's putpixel used to clamp this silently.
+    out_rgb = np.minimum(
+        (255 * alpha[:, None] + dst[:, :3] * da[:, None] * inv[:, None] // 255)
+        // np.maximum(out_a[:, None], 1),
+        255,
+    )
+    out = np.concatenate([out_rgb, out_a[:, None]], axis=1).astype(np.uint8)
+    out[out_a == 0] = 0
+    canvas[iy, ix] = out
 
-def update_particles(particles: List[Particle]):
-    for p in particles:
-        if p.life <= 0:
-            continue
-        p.x += p.vx
-        p.y += p.vy
-        p.vy += PARTICLE_GRAVITY
-        p.life -= 1
 
+# ------------------------------------------------------------
+# Animation rendering
+# ------------------------------------------------------------
 
-def draw_particles(frame: Image.Image, particles: List[Particle]):
-    draw_pixels = frame.load()
-    w, h = frame.size
+def _render_frame_kernel(base_x, base_y, rgba, pvx, pvy, pth, pok, t, canvas, gravity):
+    """Scatter one frame's shard pixels straight into the canvas.
 
-    for p in particles:
-        if p.life <= 0:
-            continue
-        ix = int(round(p.x))
-        iy = int(round(p.y))
-        if ix < 0 or iy < 0 or iy >= h or ix >= w:
+    Fuses the position update with the store so no mask or coordinate
+    temporaries are allocated; compiled with Numba (parallel over pixels)
+    when present, otherwise render_animation uses the NumPy path instead.
+    """
+    height = canvas.shape[0]
+    width = canvas.shape[1]
+    # keep the constant float32 so the position math stays in narrow lanes
+    # (a float64 scalar would silently promote every multiply)
+    half_g = np.float32(0.5) * gravity
+    for i in prange(base_x.size):
+        if not pok[i]:
             continue
+        t_eff = t if t < pth[i] else pth[i]
+        fx = base_x[i] + pvx[i] * t_eff
+        fy = base_y[i] + pvy[i] * t_eff + half_g * t_eff * t_eff
+        nx = int(round(fx))
+        ny = int(round(fy))
+        if 0 <= nx < width and 0 <= ny < height:
+            canvas[ny, nx, 0] = rgba[i, 0]
+            canvas[ny, nx, 1] = rgba[i, 1]
+            canvas[ny, nx, 2] = rgba[i, 2]
+            canvas[ny, nx, 3] = rgba[i, 3]
+
+
+if njit is not None:
+    _render_frame_kernel = njit(parallel=True, cache=True)(_render_frame_kernel)
+
+
+# Per-process render state, filled in by the pool initializer so each
+# frame task only has to pickle its frame index.
+_RENDER_STATE: Dict = {}
+# Settled-shard canvas, cached per process and keyed on how many pixels
+# have settled (monotone in t, so contiguous frame chunks reuse it).
+_STATIC_CACHE: Dict = {}
+
+# Strip height for cache-blocking the scatter, and the canvas size above
+# which blocking pays for the extra sort (small canvases fit in L2 whole).
+_STRIP_ROWS = 64
+_STRIP_MIN_BYTES = 4 << 20
+
+# Total pixel-frames below this render faster on the CPU than the GPU
+# transfers cost.
+_GPU_MIN_WORK = 1 << 22
+
+
+def _render_frames_gpu(s: Dict, frame_count: int) -> bool:
+    """Render every frame with CuPy scatters; returns False to fall back.
+
+    One GPU serves all frames, so this path runs serially in the parent
+    instead of inside the process pool; the scatter itself is the parallel
+    part. Particle compositing and PNG encoding stay on the host.
+    """
+    try:
+        base_x = cp.asarray(s["base_x"])
+        base_y = cp.asarray(s["base_y"])
+        pvx = cp.asarray(s["pvx"])
+        pvy = cp.asarray(s["pvy"])
+        pth = cp.asarray(s["pth"])
+        pok = cp.asarray(s["pok"])
+        rgba = cp.asarray(s["px_rgba"])
+        canvas_w = s["canvas_w"]
+        canvas_h = s["canvas_h"]
+        half_g = cp.float32(0.5 * GRAVITY)
+
+        for frame_idx in range(frame_count):
+            canvas = cp.zeros((canvas_h, canvas_w, 4), dtype=cp.uint8)
+            t_eff = cp.minimum(cp.float32(frame_idx), pth)
+            nx = cp.rint(base_x + pvx * t_eff).astype(cp.int32)
+            ny = cp.rint(base_y + pvy * t_eff + half_g * t_eff * t_eff).astype(cp.int32)
+            ok = (
+                pok
+                & (nx >= 0) & (nx < canvas_w)
+                & (ny >= 0) & (ny < canvas_h)
+            )
+            canvas[ny[ok], nx[ok]] = rgba[ok]
+
+            host = cp.asnumpy(canvas)
+            draw_particles(host, s["particles"], frame_idx + 1)
+            frame_path = os.path.join(s["out_dir"], f"frame_{frame_idx:03d}.png")
+            if iio is not None:
+                iio.imwrite(frame_path, host, extension=".png", compress_level=1)
+            else:
+                Image.fromarray(host, "RGBA").save(
+                    frame_path, optimize=False, compress_level=1
+                )
+        return True
+    except Exception as exc:  # CUDA runtime errors are not ImportError
+        print(f"[shatter_helper] GPU render failed ({exc}); using CPU path")
+        return False
+
+
+def _init_render_worker(state: Dict) -> None:
+    _RENDER_STATE.update(state)
+    _STATIC_CACHE.clear()
+    # One canvas per process, recycled for every frame; refilling it is a
+    # straight memcpy while a fresh allocation would also fault new pages.
+    _RENDER_STATE["frame_canvas"] = np.empty(
+        (state["canvas_h"], state["canvas_w"], 4), dtype=np.uint8
+    )
+
 
-        alpha = int(255 * (p.life / p.max_life))
-        r, g, b = 255, 255, 255
-        dr, dg, db, da = draw_pixels[ix, iy]
-        out_a = alpha + da * (255 - alpha) // 255
-        if out_a == 0:
-            draw_pixels[ix, iy] = (0, 0, 0, 0)
+def _render_single_frame(frame_idx: int) -> None:
+    """Render and save one frame from the shared per-process state."""
+    s = _RENDER_STATE
+    canvas_w = s["canvas_w"]
+    canvas_h = s["canvas_h"]
+
+    t = frame_idx
+
+    # A shard is constant once t >= t_hit, so its pixels only need to be
+    # scattered once into a static canvas; each frame then starts as a
+    # memcpy of that and scatters just the still-moving shards on top.
+    settled = s["pok"] & (s["pth"] <= t)
+    settled_count = int(np.count_nonzero(settled))
+    if _STATIC_CACHE.get("count") != settled_count:
+        static = np.zeros((canvas_h, canvas_w, 4), dtype=np.uint8)
+        m = settled & s["final_ok"]
+        static[s["final_ny"][m], s["final_nx"][m]] = s["px_rgba"][m]
+        _STATIC_CACHE["count"] = settled_count
+        _STATIC_CACHE["canvas"] = static
+    canvas = s["frame_canvas"]
+    np.copyto(canvas, _STATIC_CACHE["canvas"])
+
+    moving = s["pok"] & ~settled
+
+    if njit is not None:
+        _render_frame_kernel(
+            s["base_x"], s["base_y"], s["px_rgba"],
+            s["pvx"], s["pvy"], s["pth"], moving,
+            np.float32(t), canvas, np.float32(GRAVITY),
+        )
+    elif s["shard_counts"] is not None:
+        # Per-shard displacements were tabulated for every frame up front;
+        # expand this frame's row over each shard's contiguous pixel run.
+        dx = np.repeat(s["disp_x"][t], s["shard_counts"])
+        dy = np.repeat(s["disp_y"][t], s["shard_counts"])
+
+        nx = np.rint(s["base_x"] + dx).astype(np.int32)
+        ny = np.rint(s["base_y"] + dy).astype(np.int32)
+
+        ok = (
+            moving
+            & (nx >= 0) & (nx < canvas_w)
+            & (ny >= 0) & (ny < canvas_h)
+        )
+        # Bulk scatter: duplicate targets resolve to the last write,
+        # exactly like the old sequential putpixel loop.
+        snx = nx[ok]
+        sny = ny[ok]
+        srgba = s["px_rgba"][ok]
+        if canvas.nbytes >= _STRIP_MIN_BYTES and snx.size:
+            # Cache-block the random-access stores: bucket pixels by
+            # 64-row strip so each pass writes into an L2-resident slab.
+            # The stable sort keeps last-write order within a strip, and
+            # duplicate targets always share a strip.
+            strips = sny // _STRIP_ROWS
+            order = np.argsort(strips, kind="stable")
+            snx = snx[order]
+            sny = sny[order]
+            srgba = srgba[order]
+            strips = strips[order]
+            uniq, starts = np.unique(strips, return_index=True)
+            starts = np.append(starts, strips.size)
+            for k, strip in enumerate(uniq.tolist()):
+                i, j = starts[k], starts[k + 1]
+                y0 = strip * _STRIP_ROWS
+                slab = canvas[y0:y0 + _STRIP_ROWS]
+                slab[sny[i:j] - y0, snx[i:j]] = srgba[i:j]
         else:
-            out_r = (r * alpha + dr * da * (255 - alpha) // 255) // max(out_a, 1)
-            out_g = (g * alpha + dg * da * (255 - alpha) // 255) // max(out_a, 1)
-            out_b = (b * alpha + db * da * (255 - alpha) // 255) // max(out_a, 1)
-            draw_pixels[ix, iy] = (int(out_r), int(out_g), int(out_b), int(out_a))
+            canvas[sny, snx] = srgba
 
+    draw_particles(canvas, s["particles"], frame_idx + 1)
+
+    frame_path = os.path.join(s["out_dir"], f"frame_{frame_idx:03d}.png")
+    # PNG encoding dominates the frame cost, so trade file size for speed:
+    # imageio writes the ndarray directly at the lowest zlib level, and the
+    # PIL fallback gets the same compress_level instead of the default 6.
+    if iio is not None:
+        iio.imwrite(frame_path, canvas, extension=".png", compress_level=1)
+    else:
+        Image.fromarray(canvas, "RGBA").save(
+            frame_path, optimize=False, compress_level=1
+        )
 
-# ------------------------------------------------------------
-# Animation rendering
-# ------------------------------------------------------------
 
 def compute_canvas_size(img_w: int, img_h: int, frame_count: int) -> Tuple[int, int, int, int]:
     """
@@ -326,8 +568,8 @@ def compute_canvas_size(img_w: int, img_h: int, frame_count: int) -> Tuple[int,
 
 
 def render_animation(
-    pixels: List[Pixel],
-    shard_motions: Dict[int, ShardMotion],
+    pixels: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    shard_motions: Tuple[np.ndarray, np.ndarray, np.ndarray],
     img_w: int,
     img_h: int,
     canvas_w: int,
@@ -340,36 +582,80 @@ def render_animation(
 ):
     os.makedirs(out_dir, exist_ok=True)
 
-    particles = create_particles(origin_x, origin_y, img_w, img_h, frame_count, direction)
-
-    for frame_idx in range(frame_count):
-        frame = Image.new("RGBA", (canvas_w, canvas_h), (0, 0, 0, 0))
-        frame_pixels = frame.load()
+    px_x, px_y, px_rgba, px_sid = pixels
+    mv_x, mv_y, mv_th = shard_motions
 
-        t = frame_idx
-
-        for p in pixels:
-            motion = shard_motions.get(p.shard_id)
-            if motion is None:
-                continue
-
-            # shard falls until t_hit, then stays on the ground
-            t_eff = min(t, motion.t_hit)
-            dx = motion.vx * t
-            dy = motion.vy * t_eff + 0.5 * GRAVITY * (t_eff ** 2)
+    particles = create_particles(origin_x, origin_y, img_w, img_h, frame_count, direction)
 
-            nx = int(round(origin_x + p.x + dx))
-            ny = int(round(origin_y + p.y + dy))
+    # The per-pixel gathers depend only on geometry, so build them once
+    # instead of once per frame. t_hit 0 marks shard ids with no motion.
+    pvx = mv_x[px_sid]
+    pvy = mv_y[px_sid]
+    pth = mv_th[px_sid]
+    pok = pth > 0
+    base_x = (origin_x + px_x).astype(np.float32)
+    base_y = (origin_y + px_y).astype(np.float32)
+
+    # Pixels arrive sorted by shard id, so per-shard values expand to
+    # per-pixel arrays with np.repeat over the run lengths.
+    shard_counts = np.bincount(px_sid, minlength=mv_th.size) if px_sid.size else None
+
+    # Displacement depends only on (shard, frame), so tabulate the whole
+    # (frame_count x num_shards) grid once; a shard falls until t_hit and
+    # then stays on the ground.
+    frames_t = np.arange(frame_count, dtype=np.float32)[:, None]
+    t_eff = np.minimum(frames_t, mv_th[None, :])
+    disp_x = mv_x[None, :] * t_eff
+    disp_y = mv_y[None, :] * t_eff + 0.5 * GRAVITY * t_eff ** 2
+
+    # Final resting position of every pixel; once t >= t_hit a shard is
+    # constant, so settled shards get blitted into a shared static canvas
+    # instead of being re-scattered each frame.
+    final_nx = np.rint(base_x + pvx * pth).astype(np.int32)
+    final_ny = np.rint(base_y + pvy * pth + 0.5 * GRAVITY * pth ** 2).astype(np.int32)
+    final_ok = (
+        (final_nx >= 0) & (final_nx < canvas_w)
+        & (final_ny >= 0) & (final_ny < canvas_h)
+    )
 
-            if 0 <= nx < canvas_w and 0 <= ny < canvas_h:
-                frame_pixels[nx, ny] = p.color
+    state = {
+        "base_x": base_x,
+        "base_y": base_y,
+        "px_rgba": px_rgba,
+        "pvx": pvx,
+        "pvy": pvy,
+        "pth": pth,
+        "pok": pok,
+        "disp_x": disp_x,
+        "disp_y": disp_y,
+        "final_nx": final_nx,
+        "final_ny": final_ny,
+        "final_ok": final_ok,
+        "shard_counts": shard_counts,
+        "canvas_w": canvas_w,
+        "canvas_h": canvas_h,
+        "particles": particles,
+        "out_dir": out_dir,
+    }
 
-        update_particles(particles)
-        draw_particles(frame, particles)
+    # Big jobs go to the GPU when CuPy is importable; anything that fails
+    # there (no device, out of memory) falls through to the CPU paths.
+    if cp is not None and base_x.size * frame_count >= _GPU_MIN_WORK:
+        if _render_frames_gpu(state, frame_count):
+            return
 
-        frame_name = f"frame_{frame_idx:03d}.png"
-        frame_path = os.path.join(out_dir, frame_name)
-        frame.save(frame_path)
+    # Frames are independent now that particles have a closed form, so fan
+    # them out across cores; PNG encoding alone saturates one core. Short
+    # animations stay in-process to skip the pool startup.
+    if frame_count >= 8 and (os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(
+            initializer=_init_render_worker, initargs=(state,)
+        ) as pool:
+            list(pool.map(_render_single_frame, range(frame_count), chunksize=4))
+    else:
+        _init_render_worker(state)
+        for frame_idx in range(frame_count):
+            _render_single_frame(frame_idx)
 
 
 # ------------------------------------------------------------
@@ -510,7 +796,7 @@ def main():
     root.destroy()
 
     pixels, shard_centers, shard_bottoms = extract_pixels_and_shards(img, shard_count)
-    if not pixels:
+    if pixels[0].size == 0:
         print("Image has no non transparent pixels, nothing to animate.")
         return
 
@@ -520,6 +806,10 @@ def main():
 
     base_name = os.path.splitext(os.path.basename(input_path))[0]
 
+    # Radial spread vectors depend only on geometry; share them across
+    # the up-to-three direction passes.
+    radial = precompute_radial(shard_centers, img_w, img_h)
+
     dir_folder_names = {
         "left": "break_left",
         "forward": "break_forward",
@@ -538,6 +828,7 @@ def main():
             origin_y=origin_y,
             frame_count=frame_count,
             direction=dir_key,
+            radial=radial,
         )
         out_dir = os.path.join(output_root, f"{base_name}_{folder_suffix}")
         render_animation(